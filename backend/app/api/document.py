@@ -1,6 +1,10 @@
 import os
-import shutil
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from backend.app.core.config import settings
 from backend.app.services.document_processing import process_and_index_document
@@ -9,6 +13,48 @@ from backend.app.core.db import clear_session_history # Import to clear history
 
 router = APIRouter()
 
+# Supported upload content types and the extension used to pick a parser
+SUPPORTED_CONTENT_TYPES = {
+    "application/pdf": ".pdf",
+    "text/plain": ".txt",
+}
+
+# Global budget of upload bytes being parsed and embedded at once, shared by all requests.
+# Waiters are admitted strictly in arrival order so small uploads can't starve a large one.
+_inflight_processing_bytes = 0
+_inflight_waiters: Deque[object] = deque()
+_inflight_condition = asyncio.Condition()
+
+@asynccontextmanager
+async def reserve_processing_bytes(num_bytes: int):
+    """
+    Waits its turn until `num_bytes` fit under MAX_INFLIGHT_PROCESSING_MB, holds
+    them for the duration of the block, and releases them afterwards.
+    A single upload larger than the budget is admitted once nothing else is in flight.
+    """
+    global _inflight_processing_bytes
+    limit = settings.MAX_INFLIGHT_PROCESSING_MB * 1024 * 1024
+    ticket = object()
+    async with _inflight_condition:
+        _inflight_waiters.append(ticket)
+        try:
+            await _inflight_condition.wait_for(
+                lambda: _inflight_waiters[0] is ticket and (
+                    _inflight_processing_bytes == 0 or _inflight_processing_bytes + num_bytes <= limit
+                )
+            )
+        finally:
+            # Leave the queue whether admitted or cancelled, and let the next waiter re-check
+            _inflight_waiters.remove(ticket)
+            _inflight_condition.notify_all()
+        _inflight_processing_bytes += num_bytes
+    try:
+        yield
+    finally:
+        async with _inflight_condition:
+            _inflight_processing_bytes -= num_bytes
+            _inflight_condition.notify_all()
+
 class UploadResponse(BaseModel):
     session_id: str
     message: str
@@ -19,37 +65,37 @@ async def upload_document(
     session_id: str = Form(None) # Can be provided by client or generated
 ):
     """
-    Uploads a document (PDF/TXT), saves it, and processes it to create
-    a vector index for a given session.
+    Uploads a document (PDF/TXT) and processes it directly from the upload
+    stream to create a vector index for a given session.
     """
-    if file.content_type not in ["application/pdf", "text/plain"]:
+    if file.content_type not in SUPPORTED_CONTENT_TYPES:
         raise HTTPException(status_code=400, detail="Only PDF and TXT files are supported.")
 
-    if file.size > settings.MAX_FILE_SIZE_MB * 1024 * 1024:
+    file_size = file.size
+    if file_size is None: # Some clients omit the part size; measure the spooled body
+        file.file.seek(0, os.SEEK_END)
+        file_size = file.file.tell()
+        file.file.seek(0)
+
+    if file_size > settings.MAX_FILE_SIZE_MB * 1024 * 1024:
         raise HTTPException(status_code=413, detail=f"File size exceeds the limit of {settings.MAX_FILE_SIZE_MB} MB.")
 
     if not session_id:
         session_id = str(uuid.uuid4()) # Generate a new session ID if not provided
 
-    # Ensure the upload directory exists
-    os.makedirs(settings.UPLOAD_DIRECTORY, exist_ok=True)
+    # The validated content type picks the parser; the original name is kept for metadata
+    file_extension = SUPPORTED_CONTENT_TYPES[file.content_type]
+    filename = os.path.basename(file.filename or "") or f"{session_id}{file_extension}"
 
-    # Sanitize filename and create a secure path
-    file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'txt'
-    unique_filename = f"{session_id}.{file_extension}"
-    file_location = os.path.join(settings.UPLOAD_DIRECTORY, unique_filename)
-
-    # Save the uploaded file temporarily
+    # Parse straight from the spooled upload stream instead of copying it to disk first.
+    # Processing runs in the threadpool, bounded by the global processing byte budget.
     try:
-        with open(file_location, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Could not save file: {e}")
+        async with reserve_processing_bytes(file_size):
+            indexing_success = await run_in_threadpool(
+                process_and_index_document, session_id, file.file, filename, file_extension
+            )
     finally:
-        file.file.close()
-
-    # Process and index the document asynchronously (or in a background task)
-    indexing_success = process_and_index_document(session_id, file_location)
+        await file.close()
 
     if not indexing_success:
         raise HTTPException(status_code=500, detail="Failed to process and index the document.")
@@ -17,7 +17,9 @@ class Settings:
 
     # File upload settings
     MAX_FILE_SIZE_MB: int = int(os.getenv("MAX_FILE_SIZE_MB", 100)) # Max 100 MB
-    UPLOAD_DIRECTORY: str = "uploaded_documents" # Directory to temporarily store uploaded files
+    # Global budget, in uploaded-file MB, of documents being parsed and embedded at once.
+    # Applied after the request body has been received, so it bounds processing, not network reads.
+    MAX_INFLIGHT_PROCESSING_MB: int = int(os.getenv("MAX_INFLIGHT_PROCESSING_MB", 200))
 
     # Chroma DB settings
     CHROMA_PERSIST_DIR: str = "chroma_db_data"
@@ -27,9 +29,6 @@ class Settings:
 
 settings = Settings()
 
-# Ensure the upload directory exists
-os.makedirs(settings.UPLOAD_DIRECTORY, exist_ok=True)
-
 # Check for Google API Key
 if not settings.GOOGLE_API_KEY:
     raise ValueError("GOOGLE_API_KEY environment variable not set. Please set it to your Gemini API key.")
\ No newline at end of file
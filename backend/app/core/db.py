@@ -1,3 +1,4 @@
+import threading
 import chromadb
 from chromadb.utils import embedding_functions
 from backend.app.core.config import settings
@@ -11,17 +12,21 @@ from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 SESSION_VECTOR_STORES: Dict[str, chromadb.Client] = {}
 SESSION_CHAT_HISTORY: Dict[str, List[BaseMessage]] = {} # Store chat history as LangChain messages
 
+# Uploads are indexed in worker threads, so creating session clients and collections needs locking
+_SESSION_STORES_LOCK = threading.Lock()
+
 def get_chroma_client_for_session(session_id: str) -> chromadb.Client:
     """
     Returns an in-memory ChromaDB client for a given session ID.
     If a client for the session doesn't exist, it creates one.
     """
-    if session_id not in SESSION_VECTOR_STORES:
-        # Use a new in-memory client for each session
-        # For persistent storage, you'd initialize with a path: chromadb.PersistentClient(path="/path/to/db")
-        SESSION_VECTOR_STORES[session_id] = chromadb.Client()
-        print(f"Created new in-memory Chroma client for session: {session_id}")
-    return SESSION_VECTOR_STORES[session_id]
+    with _SESSION_STORES_LOCK:
+        if session_id not in SESSION_VECTOR_STORES:
+            # Use a new in-memory client for each session
+            # For persistent storage, you'd initialize with a path: chromadb.PersistentClient(path="/path/to/db")
+            SESSION_VECTOR_STORES[session_id] = chromadb.Client()
+            print(f"Created new in-memory Chroma client for session: {session_id}")
+        return SESSION_VECTOR_STORES[session_id]
 
 def get_or_create_collection(client: chromadb.Client, collection_name: str) -> chromadb.Collection:
     """
@@ -30,10 +35,11 @@ def get_or_create_collection(client: chromadb.Client, collection_name: str) -> c
     """
     # Use the Google Generative AI embedding function
     google_ef = get_embedding_model_for_chroma()
-    return client.get_or_create_collection(
-        name=collection_name,
-        embedding_function=google_ef # Pass the instantiated embedding function
-    )
+    with _SESSION_STORES_LOCK:
+        return client.get_or_create_collection(
+            name=collection_name,
+            embedding_function=google_ef # Pass the instantiated embedding function
+        )
 
 def add_message_to_history(session_id: str, message: BaseMessage):
     """Adds a message to the session's chat history, enforcing a limit."""
@@ -7,7 +7,7 @@ from nltk.tokenize import sent_tokenize
 # Download NLTK data if not already present
 try:
     nltk.data.find('tokenizers/punkt')
-except nltk.downloader.DownloadError:
+except LookupError:
     nltk.download('punkt')
 
 def chunk_document(text_content: str) -> List[Document]:
@@ -1,5 +1,8 @@
 import os
-from typing import List
+import io
+import codecs
+import uuid
+from typing import BinaryIO, List
 from langchain_core.documents import Document
 from backend.app.core.db import get_chroma_client_for_session, get_or_create_collection
 from backend.app.services.chunking import chunk_document
@@ -7,36 +10,52 @@ from backend.app.services.embedding import embed_documents
 from backend.app.core.config import settings
 import pypdf
 
-def extract_text_from_pdf(file_path: str) -> str:
+READ_CHUNK_SIZE = 64 * 1024 # Bytes read per iteration when streaming uploads
+
+def extract_text_from_pdf(stream: BinaryIO) -> str:
     """
-    Extracts text content from a PDF file.
+    Extracts text content from a seekable PDF stream.
     """
     text = ""
-    with open(file_path, 'rb') as f: # Open in binary read mode
-        reader = pypdf.PdfReader(f)
-        for page in reader.pages:
-            if page.extract_text(): # Ensure text is not None
-                text += page.extract_text() + "\n"
+    reader = pypdf.PdfReader(stream)
+    for page in reader.pages:
+        page_text = page.extract_text()
+        if page_text: # Ensure text is not None
+            text += page_text + "\n"
     return text
 
-def process_and_index_document(session_id: str, file_path: str) -> bool:
+def extract_text_from_txt(stream: BinaryIO) -> str:
+    """
+    Decodes a UTF-8 text stream incrementally, so multi-byte characters split
+    across read boundaries are handled without loading the raw bytes at once.
+    Line endings are normalized to '\n', as text-mode open() would do.
+    """
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(), translate=True)
+    parts: List[str] = []
+    while True:
+        block = stream.read(READ_CHUNK_SIZE)
+        if not block:
+            break
+        parts.append(decoder.decode(block))
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+def process_and_index_document(session_id: str, stream: BinaryIO, filename: str, file_extension: str) -> bool:
     """
-    Reads a document, chunks its content, embeds the chunks, and indexes them
-    into a session-specific Chroma DB collection.
-    Handles both PDF and TXT files.
+    Reads a document from an upload stream, chunks its content, embeds the
+    chunks, and indexes them into a session-specific Chroma DB collection.
+    Handles both PDF and TXT files, selected by `file_extension` ('.pdf' or '.txt').
     """
     try:
         # 1. Read the document content based on file type
-        file_extension = os.path.splitext(file_path)[1].lower()
         text_content = ""
 
         if file_extension == '.pdf':
-            print(f"Extracting text from PDF: {file_path}")
-            text_content = extract_text_from_pdf(file_path)
+            print(f"Extracting text from PDF: {filename}")
+            text_content = extract_text_from_pdf(stream)
         elif file_extension == '.txt':
-            print(f"Reading text from TXT: {file_path}")
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text_content = f.read()
+            print(f"Reading text from TXT: {filename}")
+            text_content = extract_text_from_txt(stream)
         else:
             print(f"Unsupported file type for processing: {file_extension}")
             return False
@@ -56,7 +75,7 @@ def process_and_index_document(session_id: str, file_path: str) -> bool:
         chunk_texts = [chunk.page_content for chunk in chunks]
         chunk_metadatas = [chunk.metadata for chunk in chunks]
         # Add source information to metadata (e.g., original file name)
-        original_filename = os.path.basename(file_path)
+        original_filename = os.path.basename(filename)
         for metadata in chunk_metadatas:
             metadata['source'] = original_filename # Store the original filename
 
@@ -79,8 +98,9 @@ def process_and_index_document(session_id: str, file_path: str) -> bool:
 
         print(f"Adding {len(chunks)} chunks to Chroma DB for session {session_id}...")
         # Chroma expects ids as strings, and the number of ids, documents, and embeddings must match.
-        # Generate simple sequential IDs for the chunks
-        chunk_ids = [f"chunk_{session_id}_{i}" for i in range(len(chunk_texts))] # Make IDs more unique per session
+        # Prefix sequential IDs with a per-document ID so several uploads to one session don't collide
+        document_id = uuid.uuid4().hex
+        chunk_ids = [f"chunk_{session_id}_{document_id}_{i}" for i in range(len(chunk_texts))]
 
         collection.add(
             embeddings=chunk_vectors,
@@ -99,8 +119,3 @@ def process_and_index_document(session_id: str, file_path: str) -> bool:
     except Exception as e:
         print(f"Error processing document for session {session_id}: {e}")
         return False
-    finally:
-        # Clean up the uploaded file
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            print(f"Cleaned up temporary file: {file_path}")
\ No newline at end of file
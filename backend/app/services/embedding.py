@@ -5,9 +5,13 @@ from typing import List, Dict
 import chromadb.utils.embedding_functions as embedding_functions
 import time # Import time for delays
 import os # For checking local model path
+import threading
 
 # Cache for embedding models to avoid reloading
 _embedding_models: Dict[str, Embeddings] = {}
+_chroma_embedding_functions: Dict[str, embedding_functions.SentenceTransformerEmbeddingFunction] = {}
+# Uploads are indexed in worker threads; load each model only once
+_embedding_models_lock = threading.Lock()
 
 def get_embedding_model() -> Embeddings:
     """
@@ -17,17 +21,18 @@ def get_embedding_model() -> Embeddings:
     model_name = "sentence-transformers/all-MiniLM-L6-v2"
     # HuggingFaceEmbeddings will automatically download if not found locally or in cache.
 
-    if model_name not in _embedding_models:
-        print(f"Loading embedding model: {model_name}...")
-        # Ensure 'sentence-transformers' and 'torch' are installed for this to work.
-        _embedding_models[model_name] = HuggingFaceEmbeddings(
-            model_name=model_name,
-            # If you want to use GPU, uncomment: model_kwargs={'device': 'cuda'}
-            # If you want to explicitly set the cache directory: cache_folder="/path/to/your/cache"
-            # encode_kwargs={'normalize_embeddings': False} # Set to True if normalization is desired, often good practice
-        )
-        print(f"Embedding model {model_name} loaded.")
-    return _embedding_models[model_name]
+    with _embedding_models_lock:
+        if model_name not in _embedding_models:
+            print(f"Loading embedding model: {model_name}...")
+            # Ensure 'sentence-transformers' and 'torch' are installed for this to work.
+            _embedding_models[model_name] = HuggingFaceEmbeddings(
+                model_name=model_name,
+                # If you want to use GPU, uncomment: model_kwargs={'device': 'cuda'}
+                # If you want to explicitly set the cache directory: cache_folder="/path/to/your/cache"
+                # encode_kwargs={'normalize_embeddings': False} # Set to True if normalization is desired, often good practice
+            )
+            print(f"Embedding model {model_name} loaded.")
+        return _embedding_models[model_name]
 
 def embed_documents(documents: List[str]) -> List[List[float]]:
     """
@@ -63,14 +68,17 @@ def embed_query(query: str) -> List[float]:
 
 def get_embedding_model_for_chroma():
     """
-    Returns an instance of ChromaDB's SentenceTransformerEmbeddingFunction
+    Returns a cached instance of ChromaDB's SentenceTransformerEmbeddingFunction
     which is compatible with ChromaDB client's `embedding_function` parameter,
     configured for 'sentence-transformers/all-MiniLM-L6-v2'.
     """
     model_name = "sentence-transformers/all-MiniLM-L6-v2"
-    print(f"Configuring ChromaDB for SentenceTransformer model: {model_name}")
-    # ChromaDB's SentenceTransformerEmbeddingFunction will handle downloading/loading
-    # if the model isn't already available in the environment.
-    return embedding_functions.SentenceTransformerEmbeddingFunction(
-        model_name=model_name
-    )
\ No newline at end of file
+    with _embedding_models_lock:
+        if model_name not in _chroma_embedding_functions:
+            print(f"Configuring ChromaDB for SentenceTransformer model: {model_name}")
+            # ChromaDB's SentenceTransformerEmbeddingFunction will handle downloading/loading
+            # if the model isn't already available in the environment.
+            _chroma_embedding_functions[model_name] = embedding_functions.SentenceTransformerEmbeddingFunction(
+                model_name=model_name
+            )
+        return _chroma_embedding_functions[model_name]
\ No newline at end of file
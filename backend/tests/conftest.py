@@ -0,0 +1,4 @@
+import os
+
+# config.py refuses to import without an API key; the tests never call Gemini
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
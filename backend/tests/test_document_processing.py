@@ -0,0 +1,102 @@
+import io
+import pytest
+from backend.app.services import document_processing
+from backend.app.services.document_processing import (
+    READ_CHUNK_SIZE,
+    extract_text_from_txt,
+    process_and_index_document,
+)
+
+def _make_pdf(text: str) -> bytes:
+    """Builds a minimal one-page PDF showing `text` in Helvetica."""
+    content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>",
+        b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref_offset = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        pdf += f"{offset:010d} 00000 n \n".encode()
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return pdf
+
+class FakeCollection:
+    def __init__(self):
+        self.added = []
+
+    def add(self, embeddings, documents, metadatas, ids):
+        self.added.append({"embeddings": embeddings, "documents": documents, "metadatas": metadatas, "ids": ids})
+
+class FakeClient:
+    def list_collections(self):
+        return []
+
+@pytest.fixture
+def fake_index(monkeypatch):
+    """Replaces the embedding model and Chroma with in-memory fakes; returns the collection."""
+    collection = FakeCollection()
+    monkeypatch.setattr(document_processing, "embed_documents", lambda texts: [[0.0, 1.0] for _ in texts])
+    monkeypatch.setattr(document_processing, "get_chroma_client_for_session", lambda session_id: FakeClient())
+    monkeypatch.setattr(document_processing, "get_or_create_collection", lambda client, name: collection)
+    return collection
+
+def test_extract_text_from_txt_multibyte_across_read_boundary():
+    # "€" is 3 bytes in UTF-8; place it so it straddles the first read boundary
+    text = "a" * (READ_CHUNK_SIZE - 1) + "€" + "tail"
+    raw = text.encode("utf-8")
+    assert raw[READ_CHUNK_SIZE - 1:READ_CHUNK_SIZE + 2] == "€".encode("utf-8")
+
+    assert extract_text_from_txt(io.BytesIO(raw)) == text
+
+def test_extract_text_from_txt_normalizes_line_endings():
+    assert extract_text_from_txt(io.BytesIO(b"line1\r\nline2\r\n\r\nline3\rline4")) == "line1\nline2\n\nline3\nline4"
+
+def test_extract_text_from_txt_crlf_across_read_boundary():
+    raw = b"a" * (READ_CHUNK_SIZE - 1) + b"\r\n" + b"b"
+    assert extract_text_from_txt(io.BytesIO(raw)) == "a" * (READ_CHUNK_SIZE - 1) + "\nb"
+
+def test_extract_text_from_txt_empty_stream():
+    assert extract_text_from_txt(io.BytesIO(b"")) == ""
+
+def test_extract_text_from_txt_rejects_truncated_utf8():
+    with pytest.raises(UnicodeDecodeError):
+        extract_text_from_txt(io.BytesIO("€".encode("utf-8")[:2]))
+
+def test_process_pdf_stream_uses_pdf_parser_and_original_filename(fake_index):
+    stream = io.BytesIO(_make_pdf("Hello from the PDF"))
+
+    assert process_and_index_document("session", stream, ".pdf", ".pdf")
+
+    [added] = fake_index.added
+    assert "Hello from the PDF" in " ".join(added["documents"])
+    assert all(metadata["source"] == ".pdf" for metadata in added["metadatas"])
+
+def test_process_txt_stream_uses_txt_parser_and_original_filename(fake_index):
+    stream = io.BytesIO(b"Plain text body.\r\n\r\nSecond paragraph.")
+
+    assert process_and_index_document("session", stream, "notes.md", ".txt")
+
+    [added] = fake_index.added
+    assert added["documents"] == ["Plain text body.\n\nSecond paragraph."]
+    assert added["metadatas"][0]["source"] == "notes.md"
+
+def test_process_rejects_unsupported_extension(fake_index):
+    assert not process_and_index_document("session", io.BytesIO(b"data"), "file.bin", ".bin")
+    assert fake_index.added == []
+
+def test_uploads_to_one_session_get_distinct_chunk_ids(fake_index):
+    assert process_and_index_document("session", io.BytesIO(b"first document"), "a.txt", ".txt")
+    assert process_and_index_document("session", io.BytesIO(b"second document"), "b.txt", ".txt")
+
+    first, second = fake_index.added
+    assert not set(first["ids"]) & set(second["ids"])
@@ -0,0 +1,123 @@
+import asyncio
+import pytest
+from backend.app.api import document
+from backend.app.core.config import settings
+
+MB = 1024 * 1024
+
+@pytest.fixture(autouse=True)
+def fresh_budget(monkeypatch):
+    # The condition binds to the first event loop that uses it; give each test its own
+    monkeypatch.setattr(document, "_inflight_processing_bytes", 0)
+    monkeypatch.setattr(document, "_inflight_waiters", document.deque())
+    monkeypatch.setattr(document, "_inflight_condition", asyncio.Condition())
+    monkeypatch.setattr(settings, "MAX_INFLIGHT_PROCESSING_MB", 2)
+
+async def _hold(order, name, num_bytes, release):
+    async with document.reserve_processing_bytes(num_bytes):
+        order.append(name)
+        await release.wait()
+
+def test_admits_uploads_that_fit_and_releases_bytes():
+    async def scenario():
+        async with document.reserve_processing_bytes(MB):
+            async with document.reserve_processing_bytes(MB):
+                assert document._inflight_processing_bytes == 2 * MB
+        assert document._inflight_processing_bytes == 0
+
+    asyncio.run(scenario())
+
+def test_waits_until_bytes_are_released():
+    async def scenario():
+        order = []
+        release_first = asyncio.Event()
+        release_second = asyncio.Event()
+        first = asyncio.create_task(_hold(order, "first", 2 * MB, release_first))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(_hold(order, "second", MB, release_second))
+        await asyncio.sleep(0)
+        assert order == ["first"]
+
+        release_first.set()
+        await first
+        await asyncio.sleep(0)
+        assert order == ["first", "second"]
+        assert document._inflight_processing_bytes == MB
+
+        release_second.set()
+        await second
+        assert document._inflight_processing_bytes == 0
+
+    asyncio.run(scenario())
+
+def test_oversize_upload_runs_alone():
+    async def scenario():
+        order = []
+        release_small = asyncio.Event()
+        release_big = asyncio.Event()
+        small = asyncio.create_task(_hold(order, "small", MB, release_small))
+        await asyncio.sleep(0)
+        big = asyncio.create_task(_hold(order, "big", 5 * MB, release_big))
+        await asyncio.sleep(0)
+        assert order == ["small"]
+
+        release_small.set()
+        await small
+        await asyncio.sleep(0)
+        assert order == ["small", "big"]
+        assert document._inflight_processing_bytes == 5 * MB
+
+        release_big.set()
+        await big
+        assert document._inflight_processing_bytes == 0
+
+    asyncio.run(scenario())
+
+def test_admission_is_fifo_so_large_upload_is_not_starved():
+    async def scenario():
+        order = []
+        release = {name: asyncio.Event() for name in ("a", "big", "b")}
+        a = asyncio.create_task(_hold(order, "a", MB, release["a"]))
+        await asyncio.sleep(0)
+        big = asyncio.create_task(_hold(order, "big", 2 * MB, release["big"]))
+        await asyncio.sleep(0)
+        # "b" would fit next to "a", but must queue behind the waiting large upload
+        b = asyncio.create_task(_hold(order, "b", MB, release["b"]))
+        await asyncio.sleep(0)
+        assert order == ["a"]
+
+        release["a"].set()
+        await a
+        await asyncio.sleep(0)
+        assert order == ["a", "big"]
+
+        release["big"].set()
+        await big
+        await asyncio.sleep(0)
+        assert order == ["a", "big", "b"]
+
+        release["b"].set()
+        await b
+        assert document._inflight_processing_bytes == 0
+        assert not document._inflight_waiters
+
+    asyncio.run(scenario())
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        order = []
+        release_first = asyncio.Event()
+        first = asyncio.create_task(_hold(order, "first", 2 * MB, release_first))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(_hold(order, "waiter", MB, asyncio.Event()))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert not document._inflight_waiters
+
+        release_first.set()
+        await first
+        assert document._inflight_processing_bytes == 0
+
+    asyncio.run(scenario())